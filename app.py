@@ -1,18 +1,65 @@
+import io
+import os
+
 import streamlit as st
 from receipt_parser_core import parse_receipt_text
 import pytesseract
 from PIL import Image
 
+# Tesseract's OpenMP threading scales poorly and oversubscribes the CPU
+# when several sessions OCR at once; run each tesseract process single-threaded.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# LSTM engine only, treat the receipt as a single uniform block of text, and
+# skip the retry pass that re-recognizes low-confidence lines as inverted text.
+TESSERACT_CONFIG = "--oem 1 --psm 6 -c tessedit_do_invert=0"
+
+# Tesseract's runtime grows with pixel count; phone photos are far larger
+# than receipt print needs, so cap the total pixels before OCR. Capping area
+# rather than the long edge keeps tall till-roll scans wide enough to read,
+# and lets a 12 MP photo decode at half scale.
+MAX_OCR_PIXELS = 3_000_000
+
+
+@st.cache_data(show_spinner=False)
+def extract_text(data):
+    img = Image.open(io.BytesIO(data))
+    scale = min(1.0, (MAX_OCR_PIXELS / (img.width * img.height)) ** 0.5)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    # For JPEGs, let the decoder subsample and drop chroma; no-op otherwise.
+    # draft() only scales down when both edges fit, so pass the real target.
+    img.draft("L", size)
+    if img.mode in ("I", "I;16"):
+        # 16-bit grayscale PNGs would clip to white when converted to L;
+        # scale samples down to 8 bits first, as Leptonica does.
+        img = img.convert("I").point(lambda v: v * (1 / 256))
+    if "A" in img.getbands():
+        # Flatten transparency onto white, as pytesseract does for RGBA input;
+        # converting straight to L would expose the hidden (usually black) color.
+        background = Image.new("L", img.size, 255)
+        background.paste(img.convert("L"), mask=img.getchannel("A"))
+        img = background
+    else:
+        img = img.convert("L")
+    img.thumbnail(size, Image.LANCZOS)
+    return pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
+
+
+@st.cache_data(show_spinner=False)
+def parse_text(text):
+    return parse_receipt_text(text)
+
+
 st.title("Receipt Parser")
 
 uploaded_file = st.file_uploader("Upload a receipt image", type=["png", "jpg", "jpeg"])
 
 if uploaded_file:
-    img = Image.open(uploaded_file)
-    st.image(img, caption="Uploaded Receipt")
+    data = uploaded_file.getvalue()
+    st.image(data, caption="Uploaded Receipt")
 
-    text = pytesseract.image_to_string(img)
+    text = extract_text(data)
     st.text_area("Extracted Text", text, height=200)
 
-    result = parse_receipt_text(text)
+    result = parse_text(text)
     st.json(result)